@@ -1,2 +1,3 @@
 from .mcts_agent import MCTSAgent
-from .random_agent import RandomAgent
\ No newline at end of file
+from .random_agent import RandomAgent
+from .solver_agent import SolverAgent
\ No newline at end of file
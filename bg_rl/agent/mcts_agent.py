@@ -4,16 +4,19 @@ from ..utilities.timing import time_func
 
 class MCTSAgent(Agent):
 
-    def __init__(self):
+    def __init__(self, steps=10, max_time=5, **mcts_kwargs):
         super().__init__()
         self.mcts = None
+        self.steps = steps
+        self.max_time = max_time
+        self.mcts_kwargs = mcts_kwargs
 
     def make_new_tree(self, game, num_players):
-        self.mcts = MCTS(game, num_players)
+        self.mcts = MCTS(game, num_players, **self.mcts_kwargs)
 
     @time_func
     def select_next_action(self, decision, game):
-        return self.mcts.explore_and_get_best_action(decision, game)
+        return self.mcts.explore_and_get_best_action(decision, game, self.steps, self.max_time)
 
 
     
\ No newline at end of file
@@ -0,0 +1,14 @@
+from .agent import Agent
+from ..solver import AlphaBetaSolver
+from ..utilities.timing import time_func
+
+class SolverAgent(Agent):
+
+    def __init__(self, max_depth=None, max_time=None, heuristic=None, win_score=1):
+        super().__init__()
+        self.solver = AlphaBetaSolver(max_depth, max_time, heuristic, win_score)
+
+    @time_func
+    def select_next_action(self, decision, game):
+        _, action, _ = self.solver.solve(decision, game)
+        return action
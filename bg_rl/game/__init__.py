@@ -1,5 +1,6 @@
 from .action import Action
 from .decision import Decision
 from .game import Game
+from .history import ActionHistory
 from .player import Player
 from .turn import Turn
\ No newline at end of file
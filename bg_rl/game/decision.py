@@ -14,4 +14,13 @@ class Decision(ABC):
 
     def get_legal_actions(self, game):
         possible_actions = self.get_all_possible_actions()
-        return [action for action in possible_actions if action.is_legal(game)]
\ No newline at end of file
+        return [action for action in possible_actions if action.is_legal(game)]
+
+    def get_action_priors(self, game, actions):
+        """
+        Optional prior over actions, used to order which children are created first during search
+
+        Returns a sequence of scores aligned with actions (higher is tried first), or None for no preference
+        
+        """
+        return None
\ No newline at end of file
@@ -1,7 +1,9 @@
 import sys
 from abc import ABC, abstractmethod
+from copy import deepcopy
 
 from .action import Action
+from .history import ActionHistory
 from .player import Player
 
 class Game(ABC):
@@ -11,10 +13,17 @@ class Game(ABC):
         self.decisions = []
         self.turns = []
         self.players = {}
-        self.action_history = []
+        # Shared with every copy of the game rather than copied into each
+        self.action_history = ActionHistory()
 
         self.curr_turn = None
 
+        # Terminal status is worked out at most once per action performed, and
+        # subclasses can use the move counter and last action to do it incrementally
+        self.move_count = 0
+        self.last_action = None
+        self.done = None
+
     def create_players(self, agents, player_count=None):
         """
         Creates game players
@@ -41,13 +50,38 @@ class Game(ABC):
 
     def perform_action(self, action: Action):
         action.perform(self)
-        self.action_history.append(action)
+        self.action_history = self.action_history.extended(action)
+        self.move_count += 1
+        self.last_action = action
+        self.done = None
 
     def is_player_winner(self, player):
         if player.player_id == self.winner:
             return True
         return False
 
+    def wins_after(self, action):
+        """
+        Returns whether performing action would end the game with its player as the winner, leaving this game unchanged
+
+        This plays the action on a copy of the game, so games with a cheaper way to check should override it
+        
+        """
+        game_copy = deepcopy(self)
+        game_copy.perform_action(action)
+        return game_copy.is_done() and game_copy.is_player_winner(action.player)
+
+    def is_done(self):
+        """
+        Returns whether the game is over, working it out with check_done only once per action performed
+
+        Games that override is_done directly instead of providing check_done still work, but without the caching
+        
+        """
+        if self.done is None:
+            self.done = self.check_done()
+        return self.done
+
     @abstractmethod
     def setup_game(self):
         raise NotImplementedError()
@@ -56,8 +90,14 @@ class Game(ABC):
     def play_game(self):
         raise NotImplementedError()
         
-    @abstractmethod
-    def is_done(self):
+    def check_done(self):
+        """
+        Works out whether the game is over, setting the winner if there is one
+
+        Only called by is_done, once after each action performed, so it is enough to check what
+        last_action could have changed
+
+        """
         raise NotImplementedError()
 
     @abstractmethod
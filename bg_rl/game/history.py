@@ -0,0 +1,73 @@
+from collections.abc import Sequence
+
+class ActionHistory(Sequence):
+    """
+    Persistent linked list of the actions performed in a game
+
+    extended returns a new history which shares every earlier entry with this one instead of
+    copying them, and histories are never modified, so copies of a game can share theirs. It can be
+    read like a list of actions from first to last; indexing from the end is cheapest. There is no
+    append, so code written for the old list fails loudly instead of silently dropping actions.
+
+    """
+
+    # The rest of the history belongs to every game it was copied into, not just this one
+    shared_attributes = ('previous',)
+
+    def __init__(self, action=None, previous=None):
+        self.action = action
+        self.previous = previous
+        self.length = previous.length + 1 if previous is not None else 0
+
+    def extended(self, action):
+        return ActionHistory(action, self)
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return list(self)[idx]
+        if idx < 0:
+            idx += self.length
+        if idx < 0 or idx >= self.length:
+            raise IndexError("action history index out of range")
+        entry = self
+        for _ in range(self.length - 1 - idx):
+            entry = entry.previous
+        return entry.action
+
+    def __reversed__(self):
+        entry = self
+        while entry.length > 0:
+            yield entry.action
+            entry = entry.previous
+
+    def __iter__(self):
+        return iter(list(reversed(self))[::-1])
+
+    def actions_since(self, other):
+        """
+        Returns the actions appended after other if this history continues from it, otherwise None
+        
+        """
+        if other is None or other.length > self.length:
+            return None
+        actions = []
+        entry = self
+        while entry.length > other.length:
+            actions.append(entry.action)
+            entry = entry.previous
+        if entry is not other:
+            return None
+        actions.reverse()
+        return actions
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __repr__(self):
+        return f"ActionHistory({list(self)!r})"
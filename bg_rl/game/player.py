@@ -3,6 +3,9 @@ from copy import deepcopy
 
 class Player(ABC):
 
+    # Copies of a player share these rather than copying them
+    shared_attributes = ('agent',)
+
     def __init__(self, player_id, agent):
         self.player_id = player_id
         self.agent = agent
@@ -21,7 +24,7 @@ class Player(ABC):
         result = cls.__new__(cls)
         memo[id(self)] = result
         for k, v in self.__dict__.items():
-            if k == 'agent':
+            if k in self.shared_attributes:
                 setattr(result, k, v)
             else:
                 setattr(result, k, deepcopy(v, memo))
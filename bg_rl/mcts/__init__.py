@@ -1 +1,3 @@
-from .mcts import MCTS
\ No newline at end of file
+from .mcts import MCTS, MAXN, PARANOID, PRUNE, STOP
+from .export import export_dot, export_jsonl, iter_tree, principal_variation, save_columns, summarize, to_columns, top_children
+from .rollout import EpsilonGreedyRolloutPolicy, RandomRolloutPolicy, RolloutPolicy, TruncatedRolloutPolicy, WinBlockRolloutPolicy
\ No newline at end of file
@@ -0,0 +1,147 @@
+import json
+from collections import deque
+
+import numpy as np
+
+def iter_tree(mcts, start=None, max_depth=None, min_visits=0):
+    """
+    Walks the tree breadth first from start (the root by default) without building any copies of it
+
+    Yields (parent, node, depth, action) for every edge kept, with parent and action set to None for
+    the start node. Children with fewer than min_visits visits, and anything deeper than max_depth
+    below start, are pruned along with their subtrees. Nodes reached through more than one parent are
+    yielded once per edge but only walked below once.
+
+    """
+    start = start if start is not None else mcts.root
+    seen = {start['hash']}
+    queue = deque([(start, 0)])
+    yield None, start, 0, None
+    while len(queue) > 0:
+        node, depth = queue.popleft()
+        if max_depth is not None and depth >= max_depth:
+            continue
+        for child_hash, edge in mcts.G.succ[node['hash']].items():
+            child = mcts.G.nodes[child_hash]
+            if mcts.get_visits(child) < min_visits:
+                continue
+            yield node, child, depth+1, edge['action']
+            if child_hash not in seen:
+                seen.add(child_hash)
+                queue.append((child, depth+1))
+
+def export_jsonl(mcts, fp, **prune_kwargs):
+    """
+    Streams the tree to an open text file as one JSON object per edge
+
+    prune_kwargs are passed to iter_tree
+    
+    """
+    for parent, node, depth, action in iter_tree(mcts, **prune_kwargs):
+        record = {
+            "hash": node['hash'],
+            "parent": parent['hash'] if parent is not None else None,
+            "depth": depth,
+            "action": repr(action) if action is not None else None,
+            "visits": mcts.get_visits(node),
+            "value": mcts.get_value(node).tolist(),
+        }
+        fp.write(json.dumps(record) + "\n")
+
+def export_dot(mcts, fp, label=None, **prune_kwargs):
+    """
+    Streams the tree to an open text file in graphviz DOT format
+
+    Nodes are labelled with visits and values unless label, a callable taking (mcts, node), is given.
+    prune_kwargs are passed to iter_tree
+
+    """
+    fp.write("digraph mcts {\n")
+    written = set()
+    for parent, node, depth, action in iter_tree(mcts, **prune_kwargs):
+        if node['hash'] not in written:
+            written.add(node['hash'])
+            text = label(mcts, node) if label is not None else default_label(mcts, node)
+            fp.write(f"  n{node['hash']} [label={json.dumps(text)}];\n")
+        if parent is not None:
+            edge_text = repr(action) if action is not None else ""
+            fp.write(f"  n{parent['hash']} -> n{node['hash']} [label={json.dumps(edge_text)}];\n")
+    fp.write("}\n")
+
+def default_label(mcts, node):
+    values = ", ".join(f"{value:.2f}" for value in mcts.get_value(node))
+    return f"{mcts.get_visits(node)} visits\n[{values}]"
+
+def to_columns(mcts, **prune_kwargs):
+    """
+    Collects the tree into a dict of NumPy arrays, one entry per edge
+
+    Visits and values are gathered from the search statistics in one indexing operation, so this
+    stays cheap for trees of millions of nodes. Nodes are numbered densely in the order they are
+    first reached, with "node" and "parent" holding those ids (-1 for the root's parent), and
+    "hash" holding the game hash wrapped to 64 bits. prune_kwargs are passed to iter_tree
+
+    """
+    ids = {}
+    hashes, nodes, parents, depths, indices = [], [], [], [], []
+    for parent, node, depth, action in iter_tree(mcts, **prune_kwargs):
+        node_id = ids.setdefault(node['hash'], len(ids))
+        # Game hashes can be any int, so keep their low 64 bits as a signed value
+        hashes.append((node['hash'] + 2**63) % 2**64 - 2**63)
+        nodes.append(node_id)
+        parents.append(ids[parent['hash']] if parent is not None else -1)
+        depths.append(depth)
+        indices.append(node['index'])
+    indices = np.asarray(indices, dtype=np.int64)
+    visits = mcts.visits[indices]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values = np.where(visits[:, None] > 0, mcts.totals[indices]/visits[:, None], 0)
+    return {
+        "hash": np.asarray(hashes, dtype=np.int64),
+        "node": np.asarray(nodes, dtype=np.int64),
+        "parent": np.asarray(parents, dtype=np.int64),
+        "depth": np.asarray(depths, dtype=np.int32),
+        "visits": visits,
+        "value": values,
+    }
+
+def save_columns(mcts, path, **prune_kwargs):
+    np.savez_compressed(path, **to_columns(mcts, **prune_kwargs))
+
+def top_children(mcts, node=None, k=5):
+    """
+    Returns up to k (action, child) pairs for the children of node with the most visits
+    
+    """
+    node = node if node is not None else mcts.root
+    children = [(edge['action'], mcts.G.nodes[child_hash]) for child_hash, edge in mcts.G.succ[node['hash']].items()]
+    children.sort(key=lambda pair: mcts.get_visits(pair[1]), reverse=True)
+    return children[:k]
+
+def principal_variation(mcts, start=None, max_length=None):
+    """
+    Follows the most visited child from start until reaching an unvisited leaf
+
+    Returns a list of (action, node) pairs
+    
+    """
+    node = start if start is not None else mcts.root
+    variation = []
+    while max_length is None or len(variation) < max_length:
+        best = top_children(mcts, node, k=1)
+        if len(best) == 0 or mcts.get_visits(best[0][1]) == 0:
+            break
+        variation.append(best[0])
+        node = best[0][1]
+    return variation
+
+def summarize(mcts, start=None, k=5, max_length=None):
+    start = start if start is not None else mcts.root
+    lines = [f"{mcts.G.number_of_nodes()} nodes, {mcts.get_visits(start)} visits at start"]
+    lines.append("principal variation:")
+    for action, node in principal_variation(mcts, start, max_length):
+        lines.append(f"    {action!r}: {default_label(mcts, node)}".replace("\n", " "))
+    lines.append(f"top {k} children:")
+    for action, node in top_children(mcts, start, k):
+        lines.append(f"    {action!r}: {default_label(mcts, node)}".replace("\n", " "))
+    return "\n".join(lines)
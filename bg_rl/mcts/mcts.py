@@ -1,21 +1,86 @@
 import networkx as nx
+import numpy as np
 import matplotlib.pyplot as plt
 from copy import deepcopy
 from bg_rl.game import Game
 import math
 import random
 from networkx.drawing.nx_pydot import graphviz_layout
+from ..solver import AlphaBetaSolver
+from .export import iter_tree
+from .rollout import RandomRolloutPolicy
+from ..utilities.memory import deep_getsizeof
 from ..utilities.timing import time_func
 import time
 
+MAXN = 'maxn'
+PARANOID = 'paranoid'
+
+STOP = 'stop'
+PRUNE = 'prune'
+
 class MCTS():
 
-    def __init__(self, game: Game, num_players: int):
+    def __init__(self, game: Game, num_players: int, solver_depth=None, widening_constant=None, widening_exponent=0.5,
+                 value_convention=MAXN, initial_capacity=1024, rollout_policy=None,
+                 max_nodes=None, max_bytes=None, budget_policy=STOP, prune_fraction=0.8, dag=False,
+                 solver_table_size=100000):
         self.G = nx.DiGraph()
         self.num_players = num_players
+        self.rollout_policy = rollout_policy if rollout_policy is not None else RandomRolloutPolicy()
+        # Visit counts and summed evaluations for every node live in flat arrays indexed by each
+        # node's 'index', so a whole path can be backed up with a single vectorized update
+        self.next_index = 0
+        self.free_indices = []
+        self.visits = np.zeros(initial_capacity, dtype=np.int64)
+        self.totals = np.zeros((initial_capacity, num_players), dtype=np.float64)
+        # Positions reached by different move orders share one node. With dag set, every edge also
+        # counts its own visits (the row of edge_visits given by the edge's 'index'), and the
+        # exploration term of ucb comes from the edge counts out of the parent being searched. The
+        # value comes from the shared node (UCT2), so edges need counts but no totals of their own
+        self.dag = dag
+        self.next_edge_index = 0
+        self.free_edge_indices = []
+        self.edge_visits = np.zeros(initial_capacity if dag else 0, dtype=np.int64)
+        # MAXN has each player pick children by their own value, PARANOID has every other player
+        # minimize the value of the player being searched for
+        if value_convention not in (MAXN, PARANOID):
+            raise ValueError(f"Unknown value convention {value_convention}")
+        self.value_convention = value_convention
+        # If widening_constant is set, a node with n visits only has ceil(widening_constant * n^widening_exponent)
+        # of its children created, in order of the priors given by its decision. Otherwise every
+        # child is created the first time the node is expanded.
+        self.widening_constant = widening_constant
+        self.widening_exponent = widening_exponent
+        # If set, leaves are handed to an exact solver first, and any leaf it can prove within
+        # solver_depth plies is given its exact value instead of being rolled out. Its transposition
+        # table is started afresh whenever it reaches solver_table_size entries
+        self.solver = None
+        if solver_depth is not None:
+            self.solver = AlphaBetaSolver(max_depth=solver_depth, max_table_size=solver_table_size)
+        # The tree is kept within max_nodes and max_bytes (of node games and actions) by either no
+        # longer expanding (STOP), or by collapsing the least visited subtrees back down to
+        # prune_fraction of the budget (PRUNE). Under STOP the budget is checked before every child
+        # is created, so the search itself never adds a node once max_nodes is reached, and goes past
+        # max_bytes by at most the node that reached it. Only the moves actually played are exempt:
+        # the root and its children, the nodes along the played actions, and the children of the
+        # position being searched if it has none yet, since a move has to be chosen from them.
+        # PRUNE lets the tree go over budget within a step and collapses it at the end of the step.
+        if budget_policy not in (STOP, PRUNE):
+            raise ValueError(f"Unknown budget policy {budget_policy}")
+        self.max_nodes = max_nodes
+        self.max_bytes = max_bytes
+        self.budget_policy = budget_policy
+        self.prune_fraction = prune_fraction
+        # Measuring every node is costly, so tree_bytes is only kept up to date with a byte budget
+        self.track_bytes = max_bytes is not None
+        self.tree_bytes = 0
+        self.curr_start = None
+        self.curr_path = []
+        self.curr_history = None
         game_copy = deepcopy(game)
         self.root = self.add_game_as_node(game_copy, None)
-        self.expand(self.root)
+        self.expand(self.root, within_budget=False)
         
     def add_game_as_node(self, game: Game, parent):
         game_hash = game.hash
@@ -26,59 +91,309 @@ class MCTS():
         try:
             return self.G.nodes[game_hash]
         except KeyError as e:
+            node_bytes = 0
+            if self.track_bytes:
+                # Settle the cached terminal status first so the game doesn't change size once counted
+                game.is_done()
+                node_bytes = self.get_size(game)
+                self.tree_bytes += node_bytes
             self.G.add_node(game_hash,
                             game=game,
                             hash=game_hash,
+                            index=self.allocate_index(),
+                            bytes=node_bytes,
+                            actions_bytes=0,
                             level=parent['level']+1 if parent is not None else 0,
-                            visits=0,
-                            value={i: 0 for i in range(self.num_players)},
-                            t={i: 0 for i in range(self.num_players)})
+                            player_id=None,
+                            proven=None,
+                            actions=None,
+                            action_order=None,
+                            priors=None,
+                            num_expanded=0)
             return self.G.nodes[game_hash]
 
-    def add_edge_between_nodes(self, node1, node2, action=None):
+    def allocate_index(self):
+        # Rows freed by pruning are reused before the arrays are grown
+        if len(self.free_indices) > 0:
+            idx = self.free_indices.pop()
+            self.visits[idx] = 0
+            self.totals[idx] = 0
+            return idx
+        if self.next_index == len(self.visits):
+            self.grow_statistics()
+        self.next_index += 1
+        return self.next_index - 1
+
+    def allocate_edge_index(self):
+        if len(self.free_edge_indices) > 0:
+            idx = self.free_edge_indices.pop()
+            self.edge_visits[idx] = 0
+            return idx
+        if self.next_edge_index == len(self.edge_visits):
+            self.edge_visits = self.grow_array(self.edge_visits, self.next_edge_index)
+        self.next_edge_index += 1
+        return self.next_edge_index - 1
+
+    def grow_statistics(self):
+        self.visits = self.grow_array(self.visits, self.next_index)
+        self.totals = self.grow_array(self.totals, self.next_index)
+
+    def grow_array(self, array, used):
+        grown = np.zeros((max(2*len(array), 1),) + array.shape[1:], dtype=array.dtype)
+        grown[:used] = array[:used]
+        return grown
+
+    def get_size(self, obj):
+        return deep_getsizeof(obj)
+
+    def count_tree_bytes(self):
+        total = 0
+        for node in self.G.nodes.values():
+            node['game'].is_done()
+            total += self.get_size(node['game'])
+            if node['actions'] is not None:
+                total += self.get_size(node['actions'])
+        return total
+
+    def get_memory_stats(self):
+        """
+        Returns the node count, bytes held by node games and actions, bytes per node, and
+        bytes of the visit and value arrays
+
+        Without max_bytes the tree isn't measured as it grows, so the bytes are counted here by
+        walking every node
+        
+        """
+        num_nodes = self.G.number_of_nodes()
+        tree_bytes = self.tree_bytes if self.track_bytes else self.count_tree_bytes()
+        return {
+            "nodes": num_nodes,
+            "tree_bytes": tree_bytes,
+            "bytes_per_node": tree_bytes/num_nodes if num_nodes > 0 else 0,
+            "statistics_bytes": self.visits.nbytes + self.totals.nbytes + self.edge_visits.nbytes,
+        }
+
+    def is_over_budget(self, fraction=1):
+        if self.max_nodes is not None and self.G.number_of_nodes() > fraction*self.max_nodes:
+            return True
+        if self.max_bytes is not None and self.tree_bytes > fraction*self.max_bytes:
+            return True
+        return False
+
+    def is_full(self):
+        # Whether the tree has no room left for another node
+        if self.max_nodes is not None and self.G.number_of_nodes() >= self.max_nodes:
+            return True
+        if self.max_bytes is not None and self.tree_bytes >= self.max_bytes:
+            return True
+        return False
+
+    def can_grow(self):
+        return self.budget_policy == PRUNE or not self.is_full()
+
+    def prune(self, path=()):
+        """
+        Collapses the least visited expanded nodes until the tree is within prune_fraction of its budget
+
+        Collapsing removes a node's children, and any of their descendants left with no parent, and
+        returns the node to its unexpanded state while keeping its statistics. The root and the
+        path to the position currently being searched, as well as any nodes in path, are never collapsed.
+        
+        """
+        protected = {node['hash'] for node in self.curr_path}
+        protected.update(node['hash'] for node in path)
+        protected.add(self.root['hash'])
+        candidates = [node for node_hash, node in self.G.nodes.items()
+                      if node_hash not in protected and node['actions'] is not None]
+        candidates.sort(key=lambda node: self.visits[node['index']])
+        for node in candidates:
+            if not self.is_over_budget(self.prune_fraction):
+                break
+            if node['hash'] in self.G:
+                self.collapse(node)
+
+    def collapse(self, node):
+        orphans = list(self.G.successors(node['hash']))
+        self.free_edges(node['hash'])
+        self.G.remove_edges_from([(node['hash'], child_hash) for child_hash in orphans])
+        while len(orphans) > 0:
+            node_hash = orphans.pop()
+            if self.G.in_degree(node_hash) > 0 or node_hash == self.root['hash']:
+                continue
+            orphans.extend(self.G.successors(node_hash))
+            self.free_edges(node_hash)
+            removed = self.G.nodes[node_hash]
+            self.tree_bytes -= removed['bytes'] + removed['actions_bytes']
+            self.free_indices.append(removed['index'])
+            self.G.remove_node(node_hash)
+        self.tree_bytes -= node['actions_bytes']
+        node['actions_bytes'] = 0
+        node['actions'] = None
+        node['action_order'] = None
+        node['priors'] = None
+        node['num_expanded'] = 0
+
+    def free_edges(self, node_hash):
+        if self.dag:
+            self.free_edge_indices.extend(edge['index'] for edge in self.G.succ[node_hash].values())
+
+    def get_visits(self, node):
+        return int(self.visits[node['index']])
+
+    def get_value(self, node):
+        """
+        Returns the mean evaluation of a node as an array indexed by player id
+        
+        """
+        idx = node['index']
+        if self.visits[idx] == 0:
+            return np.zeros(self.num_players)
+        return self.totals[idx]/self.visits[idx]
+
+    def get_value_for_player(self, node, player_id):
+        if self.value_convention == PARANOID and player_id != self.curr_player_id:
+            return -self.get_value(node)[self.curr_player_id]
+        return self.get_value(node)[player_id]
+
+    def evaluation_to_array(self, evaluation):
+        ts = np.zeros(self.num_players)
+        for player_id, t in evaluation.items():
+            ts[player_id] = t
+        return ts
+
+    def add_edge_between_nodes(self, node1, node2, action=None, prior=None):
         hash1 = node1["hash"]
         hash2 = node2["hash"]
-        self.G.add_edge(hash1, hash2, action=action)
+        if not self.dag:
+            self.G.add_edge(hash1, hash2, action=action, prior=prior)
+        elif not self.G.has_edge(hash1, hash2):
+            self.G.add_edge(hash1, hash2, action=action, prior=prior, index=self.allocate_edge_index())
 
     def get_parent_visits(self, node):
-        return sum([self.G.nodes[n]['visits'] for n in list(self.G.predecessors(node['hash']))])
+        return sum([self.visits[self.G.nodes[n]['index']] for n in list(self.G.predecessors(node['hash']))])
     
     def get_children(self, node):
         return [self.G.nodes[n] for n in list(self.G.successors(node['hash']))]
 
     def ucb(self, node, player_id):
-        if node["visits"] == 0:
+        visits = self.get_visits(node)
+        if visits == 0:
             return math.inf
-        parent_visits = self.get_parent_visits(node)
-        return node["value"][player_id] + 2*math.sqrt(math.log(parent_visits/node['visits']))
+        # Pruning can take away a parent of a transposed node along with the visits that came through
+        # it, leaving the node with more visits than its remaining parents
+        parent_visits = max(self.get_parent_visits(node), visits)
+        return self.get_value_for_player(node, player_id) + self.exploration(parent_visits, visits)
+
+    def exploration(self, parent_visits, visits):
+        # Shared by both modes, which differ only in the counts they pass in. Works on scalars or arrays
+        return 2*np.sqrt(np.log(parent_visits/visits))
 
-    def expand(self, node):
-        game = node["game"]
+    def init_actions(self, node):
+        # Take the decision from a copy so the node's own game is left untouched for rollouts
+        game = deepcopy(node["game"])
         next_decision = game.get_next_decision()
-        for action in next_decision.get_legal_actions(game):
-            game_copy = deepcopy(game)
-            game_copy.perform_action(action)
-            new_node = self.add_game_as_node(game_copy, node)
-            self.add_edge_between_nodes(node, new_node, action=action)
+        actions = next_decision.get_legal_actions(game)
+        priors = next_decision.get_action_priors(game, actions)
+        node['actions'] = actions
+        node['player_id'] = next_decision.player.player_id
+        if self.track_bytes:
+            node['actions_bytes'] = self.get_size(actions)
+            self.tree_bytes += node['actions_bytes']
+        # Unexpanded actions are kept as indices into actions, highest prior first
+        if priors is None:
+            node['action_order'] = np.arange(len(actions), dtype=np.int32)
+        else:
+            node['priors'] = np.asarray(priors, dtype=np.float32)
+            node['action_order'] = np.argsort(-node['priors'], kind='stable').astype(np.int32)
+        node['num_expanded'] = 0
+
+    def get_max_children(self, node):
+        if self.widening_constant is None:
+            return len(node['actions'])
+        allowed = math.ceil(self.widening_constant * max(self.get_visits(node), 1) ** self.widening_exponent)
+        return min(allowed, len(node['actions']))
+
+    def can_widen(self, node):
+        return node['actions'] is not None and node['num_expanded'] < self.get_max_children(node)
+
+    def expand_action(self, node, action_idx):
+        game_copy = deepcopy(node["game"])
+        game_copy.get_next_decision()
+        action = node['actions'][action_idx]
+        game_copy.perform_action(action)
+        new_node = self.add_game_as_node(game_copy, node)
+        prior = float(node['priors'][action_idx]) if node['priors'] is not None else None
+        self.add_edge_between_nodes(node, new_node, action=action, prior=prior)
+        node['num_expanded'] += 1
+        return new_node
+
+    def expand(self, node, within_budget=True):
+        if node['actions'] is None:
+            self.init_actions(node)
+        new_node = None
+        while self.can_widen(node) and (not within_budget or self.can_grow()):
+            new_node = self.expand_action(node, node['action_order'][node['num_expanded']])
+        return new_node
+
+    def expand_specific_action(self, node, action):
+        # Creates the child for a particular action ahead of its turn in the prior order
+        if node['actions'] is None:
+            self.init_actions(node)
+        action_idx = node['actions'].index(action)
+        order = node['action_order']
+        pos = int(np.nonzero(order == action_idx)[0][0])
+        start = node['num_expanded']
+        order[start], order[pos] = order[pos], order[start]
+        return self.expand_action(node, action_idx)
 
     def rollout(self, node):
+        return self.rollout_policy.rollout(deepcopy(node['game']))
+
+    def prove(self, node):
+        if node['proven'] is not None:
+            return node['proven']
         game_copy = deepcopy(node['game'])
-        while not game_copy.is_done():
-            next_decision = game_copy.get_next_decision()
-            actions = next_decision.get_all_possible_actions()
-            action = random.choice(actions)
-            game_copy.perform_action(action)
-        
-        return game_copy.get_evaluation()
+        decision = game_copy.get_next_decision()
+        value, _, proven = self.solver.solve(decision, game_copy)
+        if proven:
+            player_id = decision.player.player_id
+            node['proven'] = np.full(self.num_players, -value, dtype=np.float64)
+            node['proven'][player_id] = value
+        return node['proven']
 
     def find_leaf_state(self, start_node):
         path_to_node = []
+        seen = set()
         node = start_node
-        while len(self.get_children(node)) > 0:
+        # A node that could widen but is held back by the budget counts as fully expanded
+        while len(self.get_children(node)) > 0 and not (self.can_widen(node) and self.can_grow()):
             path_to_node.append(node)
-            node = max(self.get_children(node), key=lambda n: self.ucb(n, self.curr_player_id))
+            seen.add(node['hash'])
+            node = self.select_child(node)
+            # A position that repeats makes a cycle, which selection alone would follow forever
+            if node['hash'] in seen:
+                break
         return node, path_to_node
 
+    def select_child(self, node):
+        # Each player picks the child that looks best to them
+        player_id = node['player_id']
+        if self.dag:
+            return self.select_child_by_edges(node, player_id)
+        return max(self.get_children(node), key=lambda n: self.ucb(n, player_id))
+
+    def select_child_by_edges(self, node, player_id):
+        child_hashes = list(self.G.succ[node['hash']])
+        edge_idx = np.fromiter((edge['index'] for edge in self.G.succ[node['hash']].values()), dtype=np.int64, count=len(child_hashes))
+        edge_visits = self.edge_visits[edge_idx]
+        unvisited = np.flatnonzero(edge_visits == 0)
+        if len(unvisited) > 0:
+            return self.G.nodes[child_hashes[unvisited[0]]]
+        children = [self.G.nodes[child_hash] for child_hash in child_hashes]
+        values = np.array([self.get_value_for_player(child, player_id) for child in children])
+        scores = values + self.exploration(edge_visits.sum(), edge_visits)
+        return children[int(np.argmax(scores))]
+
     def get_specific_child(self, node, action):
         for child in self.get_children(node):
             if self.G.get_edge_data(node['hash'], child['hash'])['action'] == action:
@@ -95,42 +410,86 @@ class MCTS():
         game = node['game']
         # If the game is done, just get the evaluation
         if game.is_done():
-            ts = game.get_evaluation()
+            ts = self.evaluation_to_array(game.get_evaluation())
+
+        elif node['proven'] is not None:
+            ts = node['proven']
 
         else:
-            # Expand node if we've never visited before
-            if node['visits'] == 0:
-                self.expand(node)
-                ts = self.rollout(node)
+            # Expand node if we've never visited before, unless the solver can settle its value outright
+            if node['actions'] is None:
+                ts = self.prove(node) if self.solver is not None else None
+                if ts is None:
+                    if self.can_grow():
+                        self.expand(node)
+                    ts = self.evaluation_to_array(self.rollout(node))
+            elif self.can_widen(node) and self.can_grow():
+                # Enough visits have built up for another child, so create and roll out that
+                new_node = self.expand(node)
+                full_path_from_root.append(new_node)
+                ts = self.evaluation_to_array(self.rollout(new_node))
             else:
-                # Get best looking node (based on ucb) and then rollout that node
-                node = max(self.get_children(node), key=lambda n: self.ucb(n, self.curr_player_id))
-                ts = self.rollout(node)
-
-        full_path_from_root.reverse()
-
-        while len(full_path_from_root) > 0:
-            node = full_path_from_root.pop(0)
-            node['visits'] += 1
-            for player_id, t in ts.items():
-                node['t'][player_id] += t
-                node['value'][player_id] = node['t'][player_id]/node['visits']
+                # Get best looking node (based on ucb), if there is one, and then rollout that node
+                if len(self.get_children(node)) > 0:
+                    node = self.select_child(node)
+                    full_path_from_root.append(node)
+                ts = self.evaluation_to_array(self.rollout(node))
+
+        # Positions can repeat, so a node may appear more than once in the path. np.add.at counts every
+        # occurrence, where fancy indexing would only apply one increment per distinct index
+        path_idx = np.fromiter((n['index'] for n in full_path_from_root), dtype=np.int64, count=len(full_path_from_root))
+        np.add.at(self.visits, path_idx, 1)
+        np.add.at(self.totals, path_idx, ts)
+        if self.dag and len(full_path_from_root) > 1:
+            edges = self.G.edges
+            edge_idx = np.fromiter((edges[u['hash'], v['hash']]['index'] for u, v in zip(full_path_from_root, full_path_from_root[1:])),
+                                   dtype=np.int64, count=len(full_path_from_root)-1)
+            np.add.at(self.edge_visits, edge_idx, 1)
+
+        if self.budget_policy == PRUNE and self.is_over_budget():
+            self.prune(full_path_from_root)
     
-    @time_func
-    def explore(self, decision, game, steps=10, max_time=5):
-        self.curr_start = self.G.nodes[game.hash]
+    def start_search(self, decision, game):
+        """
+        Points the tree at the position in which decision must be made
+
+        Returns the path of nodes from the root to that position, which is passed to step
+        
+        """
         self.curr_player = decision.player
         self.curr_player_id = self.curr_player.player_id
 
-        parent_nodes = []
-        child = self.root
-
-        action_count = 0
+        # Usually the game has only moved on a few actions from the last search, so carry on from
+        # there rather than replaying the whole history from the root
+        actions = game.action_history.actions_since(self.curr_history)
+        if actions is not None and self.curr_start['hash'] in self.G:
+            parent_nodes = self.curr_path[:-1]
+            child = self.curr_start
+        else:
+            actions = game.action_history
+            parent_nodes = []
+            child = self.root
 
-        while child != self.curr_start:
+        # Nodes settled by the solver or held back by widening may not have the child that
+        # was played yet, so expand along the way if the tree hasn't reached the game
+        for action in actions:
             parent_nodes.append(child)
-            child = self.get_specific_child(child, game.action_history[action_count])
-            action_count += 1
+            next_child = self.get_specific_child(child, action)
+            if next_child is None:
+                next_child = self.expand_specific_action(child, action)
+            child = next_child
+
+        self.curr_start = child
+        self.curr_path = parent_nodes + [child]
+        self.curr_history = game.action_history
+        if len(self.get_children(self.curr_start)) == 0:
+            self.expand(self.curr_start, within_budget=False)
+
+        return parent_nodes
+
+    @time_func
+    def explore(self, decision, game, steps=10, max_time=5):
+        parent_nodes = self.start_search(decision, game)
 
         start_time = time.time()
         # Run for up to <steps> iterations of searches
@@ -147,24 +506,37 @@ class MCTS():
     def get_best_action(self):
         children = self.get_children(self.curr_start)
         player_id = self.curr_player_id
-        best_value = max([node['value'][player_id] for node in children])
-        best_nodes = [node for node in children if node['value'][player_id] == best_value]
+        values = [self.get_value(node)[player_id] for node in children]
+        best_value = max(values)
+        best_nodes = [node for node, value in zip(children, values) if value == best_value]
         best_node = random.choice(best_nodes)
         best_action = self.G.get_edge_data(self.curr_start['hash'], best_node['hash'])['action']
         return best_action
 
-    def explore_and_get_best_action(self, decision, game):
-        self.explore(decision, game)
+    def explore_and_get_best_action(self, decision, game, steps=10, max_time=5):
+        self.explore(decision, game, steps, max_time)
         return self.get_best_action()
 
-    def visualize_tree(self):
-        labels = {node_hash: self.label_from_node(node_hash) for node_hash in self.G.nodes}
-        pos = graphviz_layout(self.G, prog="dot")
-        nx.draw(self.G, pos, labels=labels)
-        plt.show()
+    def visualize_tree(self, max_depth=None, min_visits=0, filename=None):
+        """
+        Draws the tree, or only the part of it within max_depth of the root and with at least min_visits visits
+
+        If filename is given the drawing is saved there instead of shown
+        
+        """
+        node_hashes = {node['hash'] for _, node, _, _ in iter_tree(self, max_depth=max_depth, min_visits=min_visits)}
+        G = self.G.subgraph(node_hashes)
+        labels = {node_hash: self.label_from_node(node_hash) for node_hash in G.nodes}
+        pos = graphviz_layout(G, prog="dot")
+        nx.draw(G, pos, labels=labels)
+        if filename is not None:
+            plt.savefig(filename)
+            plt.close()
+        else:
+            plt.show()
 
     def label_from_node(self, node_name):
         node = self.G.nodes[node_name]
-        rounded_values = {k: round(v, 2) for k, v in node['value'].items()}
+        rounded_values = {k: round(float(v), 2) for k, v in enumerate(self.get_value(node))}
         # ucb = {player_id: self.ucb(node, player_id) for player_id in node['game'].players.keys()}
-        return f"{node['game'].board}\n{rounded_values}\n{node['visits']}"
\ No newline at end of file
+        return f"{node['game'].board}\n{rounded_values}\n{self.get_visits(node)}"
\ No newline at end of file
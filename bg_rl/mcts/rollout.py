@@ -0,0 +1,106 @@
+import random
+from abc import ABC, abstractmethod
+from copy import copy
+
+class RolloutPolicy(ABC):
+    """
+    Decides how MCTS plays out a game from a leaf to get its evaluation
+
+    Subclasses pick actions through select_action, or override rollout entirely to end playouts early
+    
+    """
+
+    def rollout(self, game):
+        """
+        Plays game, which the caller has already copied, to the end and returns its evaluation
+        
+        """
+        while not game.is_done():
+            decision = game.get_next_decision()
+            game.perform_action(self.select_action(decision, game))
+        return game.get_evaluation()
+
+    @abstractmethod
+    def select_action(self, decision, game):
+        raise NotImplementedError()
+
+class RandomRolloutPolicy(RolloutPolicy):
+
+    def select_action(self, decision, game):
+        return random.choice(decision.get_legal_actions(game))
+
+class WinBlockRolloutPolicy(RolloutPolicy):
+    """
+    Plays an action that wins immediately if there is one, then one that takes a square where an
+    opponent would win immediately, and otherwise a random legal action
+
+    Blocking replays each action with an opponent as its player, so it suits games where actions
+    are placements any player could make. Each ply checks every legal action for the player and
+    for each opponent through Game.wins_after, which copies the game unless the game overrides it.
+    With the copying fallback a playout is tens of times slower than with RandomRolloutPolicy, and
+    still several times slower with a cheap override.
+
+    """
+
+    def __init__(self, block=True):
+        self.block = block
+
+    def select_action(self, decision, game):
+        actions = decision.get_legal_actions(game)
+        for action in actions:
+            if game.wins_after(action):
+                return action
+        if self.block:
+            for opponent in game.players.values():
+                if opponent == decision.player:
+                    continue
+                for action in actions:
+                    opponent_action = copy(action)
+                    opponent_action.player = opponent
+                    if game.wins_after(opponent_action):
+                        return action
+        return random.choice(actions)
+
+class EpsilonGreedyRolloutPolicy(RolloutPolicy):
+    """
+    Plays the legal action with the highest heuristic(game, action) score, or a random one with probability epsilon
+    
+    """
+
+    def __init__(self, heuristic, epsilon=0.1):
+        self.heuristic = heuristic
+        self.epsilon = epsilon
+
+    def select_action(self, decision, game):
+        actions = decision.get_legal_actions(game)
+        if random.random() < self.epsilon:
+            return random.choice(actions)
+        scores = [self.heuristic(game, action) for action in actions]
+        best_score = max(scores)
+        return random.choice([action for action, score in zip(actions, scores) if score == best_score])
+
+class TruncatedRolloutPolicy(RolloutPolicy):
+    """
+    Plays at most max_plies actions with another policy, then returns evaluate(game) instead of playing on
+
+    evaluate must return a dict of player id to value on the same scale as Game.get_evaluation
+    
+    """
+
+    def __init__(self, evaluate, max_plies, policy=None):
+        self.evaluate = evaluate
+        self.max_plies = max_plies
+        self.policy = policy if policy is not None else RandomRolloutPolicy()
+
+    def rollout(self, game):
+        plies = 0
+        while not game.is_done():
+            if plies >= self.max_plies:
+                return self.evaluate(game)
+            decision = game.get_next_decision()
+            game.perform_action(self.select_action(decision, game))
+            plies += 1
+        return game.get_evaluation()
+
+    def select_action(self, decision, game):
+        return self.policy.select_action(decision, game)
@@ -0,0 +1,2 @@
+from .coordinator import Coordinator
+from .worker import run_job, run_worker
\ No newline at end of file
@@ -0,0 +1,17 @@
+import argparse
+import asyncio
+import sys
+
+from .worker import run_worker
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1", help="Coordinator host")
+    parser.add_argument("--port", "-p", type=int, required=True, help="Coordinator port")
+    parser.add_argument("--path", action="append", default=[], help="Directory to add to sys.path for importing game classes")
+
+    args = parser.parse_args()
+
+    sys.path.extend(args.path)
+    asyncio.run(run_worker(args.host, args.port))
@@ -0,0 +1,121 @@
+import asyncio
+
+from ..utilities.messaging import recv_message, send_message
+
+class Coordinator():
+    """
+    Hands self-play jobs out to workers over TCP and collects their results
+
+    Workers connect with run_worker and are given one job at a time. A job is put back in the queue
+    if its worker reports a failure, disconnects, or takes longer than job_timeout seconds, and is
+    given up on after max_retries retries. Jobs are dicts as described in run_job, and are given a
+    job_id here.
+
+    """
+
+    def __init__(self, jobs, host="127.0.0.1", port=0, max_retries=2, job_timeout=None):
+        self.jobs = {job_id: dict(job, job_id=job_id) for job_id, job in enumerate(jobs)}
+        self.host = host
+        self.port = port
+        self.max_retries = max_retries
+        self.job_timeout = job_timeout
+
+        self.attempts = {job_id: 0 for job_id in self.jobs}
+        self.results = {}
+        self.failures = {}
+        self.queue = None
+        self.finished = None
+        self.server = None
+        self.handlers = set()
+
+    async def start(self):
+        self.queue = asyncio.Queue()
+        for job in self.jobs.values():
+            self.queue.put_nowait(job)
+        self.finished = asyncio.Event()
+        self._check_finished()
+        self.server = await asyncio.start_server(self._handle_worker, self.host, self.port)
+        # If port 0 was given, report the port actually bound
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        """
+        Tells every connected worker to stop, waiting for any games they are part way through
+        
+        """
+        self.finished.set()
+        self.server.close()
+        await self.server.wait_closed()
+        await asyncio.gather(*self.handlers, return_exceptions=True)
+
+    async def wait(self):
+        """
+        Waits until every job has a result or has run out of retries
+
+        Returns the results by job id. Jobs that were given up on are in failures with their last error
+        
+        """
+        await self.finished.wait()
+        return self.results
+
+    def _check_finished(self):
+        if len(self.results) + len(self.failures) == len(self.jobs):
+            self.finished.set()
+
+    def _retry(self, job, reason):
+        job_id = job["job_id"]
+        self.attempts[job_id] += 1
+        if self.attempts[job_id] > self.max_retries:
+            self.failures[job_id] = reason
+            self._check_finished()
+        else:
+            self.queue.put_nowait(job)
+
+    async def _next_job(self):
+        # Waits for a job to hand out, returning None once every job has finished
+        get_job = asyncio.ensure_future(self.queue.get())
+        finished = asyncio.ensure_future(self.finished.wait())
+        await asyncio.wait({get_job, finished}, return_when=asyncio.FIRST_COMPLETED)
+        finished.cancel()
+        if get_job.done():
+            return get_job.result()
+        get_job.cancel()
+        return None
+
+    async def _handle_worker(self, reader, writer):
+        handler = asyncio.current_task()
+        self.handlers.add(handler)
+        job = None
+        try:
+            message = await recv_message(reader)
+            if message is None or message["type"] != "ready":
+                return
+            while True:
+                job = await self._next_job()
+                if job is None:
+                    await send_message(writer, {"type": "stop"})
+                    return
+                await send_message(writer, {"type": "job", "job": job})
+
+                try:
+                    message = await asyncio.wait_for(recv_message(reader), self.job_timeout)
+                except asyncio.TimeoutError:
+                    self._retry(job, "timed out")
+                    job = None
+                    return
+                if message is None:
+                    # The worker went away without answering
+                    break
+                if message["type"] == "result":
+                    self.results[job["job_id"]] = message["result"]
+                    self._check_finished()
+                else:
+                    self._retry(job, message.get("message", "failed"))
+                job = None
+        except (ConnectionError, ValueError) as e:
+            pass
+        finally:
+            if job is not None:
+                self._retry(job, "worker disconnected")
+            writer.close()
+            self.handlers.discard(handler)
@@ -0,0 +1,75 @@
+import asyncio
+import importlib
+import random
+import time
+
+import numpy as np
+
+from ..agent import MCTSAgent
+from ..utilities.messaging import recv_message, send_message
+
+def load_class(path):
+    # Classes are named as "module:ClassName"
+    module_name, class_name = path.split(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+def run_job(job):
+    """
+    Plays one self-play game described by a job and returns a JSON serializable result
+
+    A job has the game class as "module:ClassName", num_players, agent (keyword arguments for
+    MCTSAgent) and seed. The result holds the moves played as move ids (indices into the legal
+    actions of each decision), the winner, each player's evaluation and statistics of the search tree.
+
+    """
+    random.seed(job["seed"])
+    np.random.seed(job["seed"])
+
+    start = time.time()
+    num_players = job["num_players"]
+    agent = MCTSAgent(**job.get("agent", {}))
+    game = load_class(job["game"])()
+    game.create_players(agent, num_players)
+    game.setup_game()
+    agent.make_new_tree(game, num_players)
+
+    action_ids = []
+    while not game.is_done():
+        decision = game.get_next_decision()
+        action = decision.determine_next_action(game)
+        action_ids.append(decision.get_legal_actions(game).index(action))
+        game.perform_action(action)
+
+    winner = getattr(game, "winner", None)
+    return {
+        "actions": action_ids,
+        "winner": int(winner) if winner is not None else None,
+        "evaluation": {str(player_id): float(value) for player_id, value in game.get_evaluation().items()},
+        "num_nodes": agent.mcts.G.number_of_nodes(),
+        "root_visits": agent.mcts.get_visits(agent.mcts.root),
+        "seconds": time.time() - start,
+    }
+
+async def run_worker(host, port):
+    """
+    Connects to a Coordinator and plays the jobs it hands out until told to stop
+    
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    loop = asyncio.get_running_loop()
+    try:
+        await send_message(writer, {"type": "ready"})
+        while True:
+            message = await recv_message(reader)
+            if message is None or message["type"] == "stop":
+                break
+            job = message["job"]
+            try:
+                # Play in a thread so the connection stays serviced during long games
+                result = await loop.run_in_executor(None, run_job, job)
+                reply = {"type": "result", "job_id": job["job_id"], "result": result}
+            except Exception as e:
+                reply = {"type": "failed", "job_id": job["job_id"], "message": f"{type(e).__name__}: {e}"}
+            await send_message(writer, reply)
+    finally:
+        writer.close()
@@ -0,0 +1,2 @@
+from .move_service import MoveService
+from .server import MoveClient, MoveServer
\ No newline at end of file
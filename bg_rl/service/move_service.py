@@ -0,0 +1,196 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ..agent import MCTSAgent
+
+class MoveRequest():
+
+    def __init__(self, game_id, decision, game, deadline, future, lock):
+        self.game_id = game_id
+        self.decision = decision
+        self.game = game
+        self.deadline = deadline
+        self.future = future
+        # The game's lock is held until the request is answered or dropped, and released exactly once
+        self.lock = lock
+        self.started = False
+        self.released = False
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            self.lock.release()
+
+class MoveService():
+    """
+    Serves MCTS moves for many games at once from a single asyncio event loop
+
+    Each open game keeps its own MCTSAgent and tree. Move requests are queued and picked up by a
+    bounded set of workers, each of which takes a batch of waiting requests and steps all of their
+    searches together in one executor job until each has used its steps or reached its deadline.
+    A search can only stop between steps, so its answer is waited for up to grace seconds past the
+    deadline.
+
+    """
+
+    def __init__(self, num_workers=4, batch_size=8, steps=100, timeout=5, grace=1, **mcts_kwargs):
+        self.num_workers = num_workers
+        self.batch_size = batch_size
+        self.steps = steps
+        self.timeout = timeout
+        self.grace = grace
+        self.mcts_kwargs = mcts_kwargs
+
+        self.agents = {}
+        self.locks = {}
+        self.queue = None
+        self.workers = []
+        self.executor = None
+        self.stopping = False
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    async def start(self):
+        self.stopping = False
+        self.queue = asyncio.Queue()
+        self.executor = ThreadPoolExecutor(max_workers=self.num_workers)
+        self.workers = [asyncio.create_task(self._worker()) for _ in range(self.num_workers)]
+
+    async def stop(self):
+        # Searches under way check this between steps, so shutting down the executor doesn't wait out their deadlines
+        self.stopping = True
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+        # Requests no worker picked up would otherwise wait out their deadlines
+        while not self.queue.empty():
+            request = self.queue.get_nowait()
+            if not request.future.done():
+                request.future.set_exception(RuntimeError("Move service stopped"))
+            request.release()
+        self.executor.shutdown(wait=True)
+        self.executor = None
+
+    def open_game(self, game_id, game, num_players):
+        agent = MCTSAgent(**self.mcts_kwargs)
+        agent.make_new_tree(game, num_players)
+        self.agents[game_id] = agent
+        self.locks[game_id] = asyncio.Lock()
+
+    def close_game(self, game_id):
+        self.agents.pop(game_id, None)
+        self.locks.pop(game_id, None)
+
+    async def request_move(self, game_id, decision, game, timeout=None):
+        """
+        Searches for a move in an open game and returns the chosen action
+
+        The search stops at the deadline and answers with the best action found so far. A request
+        whose search has not started by its deadline, because it is queued or waiting on an earlier
+        request for the same game, raises asyncio.TimeoutError instead.
+
+        """
+        if game_id not in self.agents:
+            raise KeyError(f"Game {game_id} is not open")
+        timeout = timeout if timeout is not None else self.timeout
+        deadline = time.time() + timeout
+        # A tree can only run one search at a time
+        lock = self.locks[game_id]
+        try:
+            await asyncio.wait_for(lock.acquire(), max(deadline - time.time(), 0))
+        except asyncio.TimeoutError:
+            raise asyncio.TimeoutError(f"Move request for game {game_id} expired waiting for the game") from None
+
+        request = MoveRequest(game_id, decision, game, deadline, asyncio.get_running_loop().create_future(), lock)
+        self.queue.put_nowait(request)
+        try:
+            # Shielded so that a search already under way is left to answer just after the deadline
+            return await asyncio.wait_for(asyncio.shield(request.future), max(deadline - time.time(), 0))
+        except asyncio.TimeoutError:
+            if request.started:
+                try:
+                    return await asyncio.wait_for(request.future, self.grace)
+                except asyncio.TimeoutError:
+                    raise asyncio.TimeoutError(f"Move request for game {game_id} was not answered in time") from None
+            raise asyncio.TimeoutError(f"Move request for game {game_id} expired in the queue") from None
+        finally:
+            # A request that never reached a search gives up the game straight away, otherwise the
+            # worker releases it once the tree is no longer in use
+            if not request.future.done():
+                request.future.cancel()
+            if not request.started:
+                request.release()
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+
+            requests = []
+            for request in batch:
+                if request.future.cancelled():
+                    request.release()
+                elif time.time() >= request.deadline:
+                    request.future.set_exception(asyncio.TimeoutError(f"Move request for game {request.game_id} expired in the queue"))
+                    request.release()
+                else:
+                    request.started = True
+                    requests.append(request)
+
+            try:
+                results = await loop.run_in_executor(self.executor, self._search_batch, requests)
+            except asyncio.CancelledError:
+                # The service is stopping, so nothing will answer these searches
+                for request in requests:
+                    if not request.future.done():
+                        request.future.set_exception(RuntimeError("Move service stopped during the search"))
+                raise
+            finally:
+                for request in requests:
+                    request.release()
+
+            for request, result in zip(requests, results):
+                if request.future.done():
+                    continue
+                if isinstance(result, Exception):
+                    request.future.set_exception(result)
+                else:
+                    request.future.set_result(result)
+
+    def _search_batch(self, requests):
+        searches = {}
+        results = [None]*len(requests)
+        for i, request in enumerate(requests):
+            try:
+                mcts = self.agents[request.game_id].mcts
+                searches[i] = (mcts, mcts.start_search(request.decision, request.game))
+            except Exception as e:
+                results[i] = e
+
+        # Step every search in turn so that all requests in the batch progress together
+        steps_taken = 0
+        while len(searches) > 0 and not self.stopping:
+            now = time.time()
+            for i in list(searches.keys()):
+                mcts, parent_nodes = searches[i]
+                try:
+                    if steps_taken >= self.steps or now >= requests[i].deadline:
+                        results[i] = mcts.get_best_action()
+                        del searches[i]
+                    else:
+                        mcts.step(parent_nodes)
+                except Exception as e:
+                    results[i] = e
+                    del searches[i]
+            steps_taken += 1
+
+        return results
@@ -0,0 +1,161 @@
+import asyncio
+
+from ..utilities.messaging import recv_message, send_message
+
+def replay_actions(game, action_ids):
+    """
+    Plays a list of move ids onto a freshly set up game
+
+    A move id is the index of the action in the legal actions of the decision it was chosen for.
+    Returns the next decision to be made, which has already been taken from the game.
+
+    """
+    for action_id in action_ids:
+        decision = game.get_next_decision()
+        game.perform_action(decision.get_legal_actions(game)[action_id])
+    return game.get_next_decision()
+
+class MoveServer():
+    """
+    Exposes a MoveService over a local socket
+
+    Clients send one JSON object per line:
+        {"type": "open", "game_id": ...}
+        {"type": "move", "game_id": ..., "actions": [move ids played so far], "timeout": seconds (optional)}
+        {"type": "close", "game_id": ...}
+    and receive a reply of the same type, with the chosen move id and its description for moves,
+    or a reply of type "error". A message may also carry an "id", which its reply echoes so that
+    several requests for one game can be in flight at once. game_factory must return a new game
+    with its players created and set up.
+
+    """
+
+    def __init__(self, service, game_factory, num_players, host="127.0.0.1", port=0):
+        self.service = service
+        self.game_factory = game_factory
+        self.num_players = num_players
+        self.host = host
+        self.port = port
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        # If port 0 was given, report the port actually bound
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle_client(self, reader, writer):
+        write_lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                message = await recv_message(reader)
+                if message is None:
+                    break
+                # Handle each message in its own task so one connection can have moves for many games in flight
+                task = asyncio.create_task(self._handle_message(message, writer, write_lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            writer.close()
+
+    async def _handle_message(self, message, writer, write_lock):
+        game_id = message.get("game_id")
+        try:
+            reply = await self._process(message)
+        except Exception as e:
+            reply = {"type": "error", "game_id": game_id, "message": f"{type(e).__name__}: {e}"}
+        if "id" in message:
+            reply["id"] = message["id"]
+        async with write_lock:
+            await send_message(writer, reply)
+
+    async def _process(self, message):
+        message_type = message["type"]
+        game_id = message["game_id"]
+        if message_type == "open":
+            self.service.open_game(game_id, self.game_factory(), self.num_players)
+            return {"type": "open", "game_id": game_id}
+        elif message_type == "move":
+            game = self.game_factory()
+            decision = replay_actions(game, message["actions"])
+            action = await self.service.request_move(game_id, decision, game, message.get("timeout"))
+            action_id = decision.get_legal_actions(game).index(action)
+            return {"type": "move", "game_id": game_id, "action": action_id, "description": repr(action)}
+        elif message_type == "close":
+            self.service.close_game(game_id)
+            return {"type": "close", "game_id": game_id}
+        raise ValueError(f"Unknown message type {message_type}")
+
+class MoveClient():
+    """
+    Minimal client for MoveServer which matches replies to requests by request id
+
+    Requests still waiting when the connection closes raise ConnectionError.
+    
+    """
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+        self.pending = {}
+        self.next_id = 0
+        self.listener = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.listener = asyncio.create_task(self._listen())
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        self.listener.cancel()
+
+    async def _listen(self):
+        try:
+            while True:
+                reply = await recv_message(self.reader)
+                if reply is None:
+                    break
+                future = self.pending.pop(reply.get("id"), None)
+                if future is None or future.done():
+                    continue
+                if reply["type"] == "error":
+                    future.set_exception(RuntimeError(reply["message"]))
+                else:
+                    future.set_result(reply)
+        finally:
+            # No more replies can arrive, so nothing still pending will ever be answered
+            pending, self.pending = self.pending, {}
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Connection to move server closed"))
+
+    async def _request(self, message):
+        if self.listener.done():
+            raise ConnectionError("Connection to move server closed")
+        request_id = self.next_id
+        self.next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        try:
+            await send_message(self.writer, dict(message, id=request_id))
+            return await future
+        finally:
+            self.pending.pop(request_id, None)
+
+    async def open_game(self, game_id):
+        await self._request({"type": "open", "game_id": game_id})
+
+    async def request_move(self, game_id, actions, timeout=None):
+        reply = await self._request({"type": "move", "game_id": game_id, "actions": actions, "timeout": timeout})
+        return reply["action"]
+
+    async def close_game(self, game_id):
+        await self._request({"type": "close", "game_id": game_id})
@@ -0,0 +1 @@
+from .solver import AlphaBetaSolver
\ No newline at end of file
@@ -0,0 +1,160 @@
+import math
+import time
+from copy import deepcopy
+from bg_rl.game import Game
+
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+class SearchTimeout(Exception):
+    pass
+
+class AlphaBetaSolver():
+    """
+    Exact solver for two player, zero-sum games
+
+    Runs iterative deepening negamax with alpha-beta pruning over the generic Game/Decision API.
+    Values are always from the perspective of the player making the decision, and positions are
+    stored in a transposition table keyed on game.hash which persists between calls to solve.
+
+    win_score is the value of a win on the scale of Game.get_evaluation. A move proven to reach it
+    proves its position at once, while losses and draws are only proven once every move is.
+    If max_table_size is set, the transposition table is cleared whenever it fills up.
+
+    """
+
+    def __init__(self, max_depth=None, max_time=None, heuristic=None, win_score=1, max_table_size=None):
+        self.max_depth = max_depth
+        self.max_time = max_time
+        self.win_score = win_score
+        self.max_table_size = max_table_size
+        # Optional callable (game, player_id) -> value used at the depth horizon
+        self.heuristic = heuristic
+        self.transposition_table = {}
+        self.nodes_searched = 0
+        self.deadline = None
+
+    def clear(self):
+        self.transposition_table = {}
+
+    def _store(self, key, entry):
+        table = self.transposition_table
+        if self.max_table_size is not None and len(table) >= self.max_table_size and key not in table:
+            self.clear()
+        self.transposition_table[key] = entry
+
+    def solve(self, decision, game: Game, max_depth=None, max_time=None):
+        """
+        Searches the position in which decision must be made
+
+        Returns a tuple of (value, action, proven). proven is True if the value is exact rather than
+        an estimate made at the depth horizon. If max_depth is None, deepening continues until the
+        position is proven or max_time runs out.
+
+        """
+        max_depth = max_depth if max_depth is not None else self.max_depth
+        max_time = max_time if max_time is not None else self.max_time
+        self.deadline = time.time() + max_time if max_time is not None else None
+
+        legal_actions = decision.get_legal_actions(game)
+        value, best_idx, proven = 0, 0, False
+
+        depth = 1
+        while max_depth is None or depth <= max_depth:
+            try:
+                value, proven, best_idx = self._negamax(game, decision, depth, -math.inf, math.inf)
+            except SearchTimeout:
+                break
+            if proven:
+                break
+            depth += 1
+
+        self.deadline = None
+        best_action = legal_actions[best_idx] if len(legal_actions) > 0 else None
+        return value, best_action, proven
+
+    def _check_time(self):
+        if self.deadline is not None and time.time() > self.deadline:
+            raise SearchTimeout()
+
+    def _evaluate_horizon(self, game, player_id):
+        if self.heuristic is None:
+            return 0
+        return self.heuristic(game, player_id)
+
+    def _search(self, game, depth, alpha, beta, player_id):
+        # Value of a position in which the next decision has not yet been taken, from the
+        # perspective of player_id
+        if game.is_done():
+            return game.get_evaluation()[player_id], True
+        if depth == 0:
+            return self._evaluate_horizon(game, player_id), False
+
+        decision = game.get_next_decision()
+        if decision.player.player_id != player_id:
+            value, proven, _ = self._negamax(game, decision, depth, -beta, -alpha)
+            return -value, proven
+        value, proven, _ = self._negamax(game, decision, depth, alpha, beta)
+        return value, proven
+
+    def _negamax(self, game, decision, depth, alpha, beta):
+        self._check_time()
+        self.nodes_searched += 1
+
+        alpha_orig = alpha
+        key = game.hash
+        best_idx = None
+
+        entry = self.transposition_table.get(key)
+        if entry is not None:
+            entry_depth, entry_value, flag, best_idx = entry
+            if entry_depth >= depth:
+                proven = entry_depth == math.inf
+                if flag == EXACT:
+                    return entry_value, proven, best_idx
+                elif flag == LOWER_BOUND:
+                    alpha = max(alpha, entry_value)
+                else:
+                    beta = min(beta, entry_value)
+                if alpha >= beta:
+                    return entry_value, proven, best_idx
+
+        legal_actions = decision.get_legal_actions(game)
+        if len(legal_actions) == 0:
+            return 0, True, None
+
+        # Search the best move from previous iterations first, as it is the most likely to cause a cutoff
+        order = list(range(len(legal_actions)))
+        if best_idx is not None:
+            order.remove(best_idx)
+            order.insert(0, best_idx)
+
+        player_id = decision.player.player_id
+        best_value = -math.inf
+        all_proven = True
+        for idx in order:
+            game_copy = deepcopy(game)
+            game_copy.perform_action(legal_actions[idx])
+            value, proven = self._search(game_copy, depth-1, alpha, beta, player_id)
+            if proven and value >= self.win_score:
+                # Nothing can do better than a proven win, whatever the other moves turn out to be
+                self._store(key, (math.inf, value, EXACT, idx))
+                return value, True, idx
+            all_proven = all_proven and proven
+            if value > best_value:
+                best_value = value
+                best_idx = idx
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+
+        if best_value <= alpha_orig:
+            flag = UPPER_BOUND
+        elif best_value >= beta:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        self._store(key, (math.inf if all_proven else depth, best_value, flag, best_idx))
+
+        return best_value, all_proven, best_idx
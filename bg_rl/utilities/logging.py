@@ -1,8 +1,13 @@
 import logging
+import os
 
 def configure_logger(logger_name, log_filepath, level):
     logger = logging.getLogger(logger_name)
     logger.setLevel(level)
+    # Log directories aren't kept in the repo, so create them on first use
+    log_dir = os.path.dirname(log_filepath)
+    if log_dir:
+        os.makedirs(log_dir, exist_ok=True)
     fh = logging.FileHandler(log_filepath, 'w')
     fh.setLevel(level)
     formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
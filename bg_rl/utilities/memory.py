@@ -0,0 +1,47 @@
+import sys
+import types
+
+import numpy as np
+
+# Objects which are shared rather than owned, and so never counted
+SHARED_TYPES = (type, types.ModuleType, types.FunctionType, types.MethodType, types.BuiltinFunctionType)
+
+def deep_getsizeof(obj, skip_types=(), seen=None):
+    """
+    Estimates the bytes held by obj and everything reachable from it
+
+    Objects of skip_types, and attributes an object lists in shared_attributes, are not counted or
+    walked into. Pass the same seen set to several calls
+    to avoid counting objects they share more than once.
+
+    """
+    if seen is None:
+        seen = set()
+    skip_types = SHARED_TYPES + tuple(skip_types)
+
+    total = 0
+    stack = [obj]
+    while len(stack) > 0:
+        o = stack.pop()
+        if id(o) in seen or isinstance(o, skip_types):
+            continue
+        seen.add(id(o))
+        # For arrays which own their data this includes the data buffer
+        total += sys.getsizeof(o)
+
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(o)
+        elif isinstance(o, np.ndarray):
+            if o.base is not None:
+                stack.append(o.base)
+        elif hasattr(o, "__dict__"):
+            # Attributes an object shares between its copies (such as a player's agent) belong to none of them
+            shared = getattr(o, "shared_attributes", ())
+            # Instance dicts report a different size depending on whether other instances still share
+            # their keys, so measure an ordinary copy to get the same answer every time
+            total += sys.getsizeof(dict(o.__dict__))
+            stack.extend(v for k, v in o.__dict__.items() if k not in shared)
+    return total
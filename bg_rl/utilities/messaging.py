@@ -0,0 +1,13 @@
+import json
+
+# Messages are JSON objects sent one per line
+
+async def send_message(writer, message):
+    writer.write((json.dumps(message) + "\n").encode())
+    await writer.drain()
+
+async def recv_message(reader):
+    line = await reader.readline()
+    if not line:
+        return None
+    return json.loads(line)
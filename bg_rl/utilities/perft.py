@@ -0,0 +1,99 @@
+import time
+from copy import deepcopy
+
+class Perft():
+    """
+    Walks every line of a game to a fixed depth through the generic Game/Decision/Action API
+
+    Leaf counts give game implementations a correctness baseline, and the timings give a throughput
+    number for their game logic independent of any search. A position reached exactly at the
+    requested depth is a leaf whether or not the game is over there, while a game that ends before
+    then contributes no leaves.
+
+    Timings are collected for get_next_decision (which includes move_to_next_turn when a turn ends),
+    get_legal_actions, copying the game, perform_action and is_done.
+
+    """
+
+    TIMED_CALLS = ("get_next_decision", "get_legal_actions", "copy", "perform_action", "is_done")
+
+    def __init__(self, game):
+        self.game = game
+        self.reset()
+
+    def reset(self):
+        self.nodes = 0
+        self.terminals = 0
+        self.seconds = 0
+        self.timings = {name: 0 for name in self.TIMED_CALLS}
+
+    @property
+    def nodes_per_second(self):
+        if self.seconds == 0:
+            return 0
+        return self.nodes/self.seconds
+
+    def run(self, depth):
+        """
+        Returns the number of leaves at depth, recording node counts and timings as it goes
+        
+        """
+        self.reset()
+        start = time.perf_counter()
+        leaves = self._perft(deepcopy(self.game), depth)
+        self.seconds = time.perf_counter() - start
+        return leaves
+
+    def divide(self, depth):
+        """
+        Returns the number of leaves at depth below each action available in the starting position
+        
+        """
+        self.reset()
+        game = deepcopy(self.game)
+        decision = game.get_next_decision()
+        counts = {}
+        for action in decision.get_legal_actions(game):
+            game_copy = deepcopy(game)
+            game_copy.perform_action(action)
+            if depth <= 1:
+                counts[repr(action)] = 1
+            elif game_copy.is_done():
+                counts[repr(action)] = 0
+            else:
+                counts[repr(action)] = self._perft(game_copy, depth-1)
+        return counts
+
+    def report(self):
+        lines = [f"nodes: {self.nodes}, terminal: {self.terminals}, {self.seconds:.3f}s, {self.nodes_per_second:.0f} nodes/s"]
+        for name, seconds in self.timings.items():
+            share = seconds/self.seconds if self.seconds > 0 else 0
+            lines.append(f"    {name}: {seconds:.3f}s ({share:.0%})")
+        return "\n".join(lines)
+
+    def _timed(self, name, f, *args):
+        start = time.perf_counter()
+        result = f(*args)
+        self.timings[name] += time.perf_counter() - start
+        return result
+
+    def _perft(self, game, depth):
+        if depth == 0:
+            return 1
+
+        decision = self._timed("get_next_decision", game.get_next_decision)
+        actions = self._timed("get_legal_actions", decision.get_legal_actions, game)
+
+        leaves = 0
+        for action in actions:
+            game_copy = self._timed("copy", deepcopy, game)
+            self._timed("perform_action", game_copy.perform_action, action)
+            self.nodes += 1
+            done = self._timed("is_done", game_copy.is_done)
+            if done:
+                self.terminals += 1
+            if depth == 1:
+                leaves += 1
+            elif not done:
+                leaves += self._perft(game_copy, depth-1)
+        return leaves
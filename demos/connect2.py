@@ -69,21 +69,26 @@ class Connect2Game(Game):
             self.turns.append(Connect2Turn(player))
 
     def play_game(self):
-        while self.get_winner() == EMPTY_SPACE and not self.board_is_full():
+        while not self.is_done():
             next_decision = self.get_next_decision()
             next_action = next_decision.determine_next_action(self)
             self.perform_action(next_action)
-            if self.is_winner():
-                break
 
     def is_winner(self):
-        for i in range(0, len(self.board)-1):
-            if self.board[i] != EMPTY_SPACE and self.board[i] == self.board[i+1]:
-                self.winner = self.board[i]
+        if self.winner != EMPTY_SPACE:
+            return True
+        if self.last_action is None:
+            return False
+        # Only a pair including the last space played can be new
+        space = self.last_action.space
+        player_id = self.board[space]
+        for neighbour in (space-1, space+1):
+            if 0 <= neighbour < len(self.board) and self.board[neighbour] == player_id:
+                self.winner = int(player_id)
                 return True
         return False
 
-    def is_done(self):
+    def check_done(self):
         return self.is_winner() or self.board_is_full()
 
     def move_to_next_turn(self):
@@ -96,7 +101,8 @@ class Connect2Game(Game):
         return self.winner
 
     def board_is_full(self):
-        return sum(np.where(self.board == EMPTY_SPACE, 1, 0)) == 0
+        # Every action fills exactly one space
+        return self.move_count == len(self.board)
 
     def hash_game_state(self):
         return hash(np.array2string(self.board))
@@ -146,7 +152,7 @@ def main(args):
             first_move = list(zip(*np.where(child['game'].board == 0)))[0]
             if move_values.get(first_move) is None:
                 move_values[first_move] = []
-            move_values[first_move].append(child['value'][0])
+            move_values[first_move].append(agent.mcts.get_value(child)[0])
         game = Connect2Game()
         game.create_players(agent, num_players)
         game.setup_game()
@@ -5,7 +5,7 @@ from bg_rl.agent import MCTSAgent
 import numpy as np
 import matplotlib.pyplot as plt
 from bg_rl.utilities.timing import time_func
-from scipy.signal import convolve2d
+import sys
 
 EMPTY_SPACE = -1
 
@@ -18,9 +18,8 @@ class SelectSpaceAction(Action):
     def is_legal(self, game):
         return game.board.is_column_legal(self.space)
 
-    def perform_action(self, game):
-        game.board[self.space] = self.player.player_id
-        super().perform_action(game)
+    def perform(self, game):
+        game.board.drop_piece(self.space, self.player.player_id)
 
     def __repr__(self):
         return f"{self.player.player_id} in space {self.space}"
@@ -44,24 +43,48 @@ class Connect4Board():
     def __init__(self):
 
         self.board = np.full((6, 7), EMPTY_SPACE)
+        self.num_pieces = 0
+        self.last_move = None
+
+    def __str__(self):
+        return str(self.board)
 
     def is_full(self):
-        return np.all(sum(np.where(self.board == EMPTY_SPACE, 1, 0)) == 0)
-
-    def is_winner(self, player_ids):
-        horizontal_kernel = np.array([1, 1, 1, 1])
-        vertical_kernel = np.transpose(horizontal_kernel)
-        diag1_kernel = np.eye(4, dtype=np.uint8)
-        diag2_kernel = np.fliplr(diag1_kernel)
-        detection_kernels = [horizontal_kernel, vertical_kernel, diag1_kernel, diag2_kernel]
-        for player_id in player_ids:
-            for kernel in detection_kernels:
-                if (convolve2d(self.board == player_id, kernel, mode="valid") == 4).any():
-                    return player_id
+        return self.num_pieces == self.board.size
+
+    def is_winner_at(self, row, col):
+        # Counts the run through (row, col) in each direction, so only lines the piece there is part of are checked
+        player_id = self.board[row][col]
+        rows, cols = self.board.shape
+        for d_row, d_col in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            count = 1
+            for sign in (1, -1):
+                r, c = row + sign*d_row, col + sign*d_col
+                while 0 <= r < rows and 0 <= c < cols and self.board[r][c] == player_id:
+                    count += 1
+                    r, c = r + sign*d_row, c + sign*d_col
+            if count >= 4:
+                return int(player_id)
         return EMPTY_SPACE
 
+    def wins_with(self, col, player_id):
+        # Tries the piece in place and takes it back again rather than copying the board
+        row = np.nonzero(self.board[:, col] == EMPTY_SPACE)[0][-1]
+        self.board[row][col] = player_id
+        winner = self.is_winner_at(row, col)
+        self.board[row][col] = EMPTY_SPACE
+        return winner == player_id
+
     def is_column_legal(self, col):
         return self.board[0][col] == EMPTY_SPACE
+
+    def drop_piece(self, col, player_id):
+        # Pieces fall to the lowest empty row of the column
+        row = np.nonzero(self.board[:, col] == EMPTY_SPACE)[0][-1]
+        self.board[row][col] = player_id
+        self.num_pieces += 1
+        self.last_move = (row, col)
+        return row
                 
 
 class Connect4Game(Game):
@@ -71,6 +94,10 @@ class Connect4Game(Game):
         self.board = Connect4Board()
         self.winner = EMPTY_SPACE
 
+    @property
+    def hash(self):
+        return hash(str(self.board.board)) + sys.maxsize + 1
+
     def create_players(self, agents, player_count=None):
         """
         Creates game players
@@ -93,24 +120,29 @@ class Connect4Game(Game):
 
     @time_func
     def play_game(self):
-        while self.get_winner() == EMPTY_SPACE and not self.board_is_full():
+        while not self.is_done():
             next_decision = self.get_next_decision()
             next_action = next_decision.determine_next_action(self)
             # print(next_action)
-            next_action.perform_action(self)
-            if self.is_winner():
-                break
+            self.perform_action(next_action)
 
     def is_winner(self):
-        winner = self.board.is_winner()
+        if self.winner != EMPTY_SPACE:
+            return True
+        if self.board.last_move is None:
+            return False
+        winner = self.board.is_winner_at(*self.board.last_move)
         if winner != EMPTY_SPACE:
             self.winner = winner
             return True
         return False
                 
-    def is_done(self):
+    def check_done(self):
         return self.is_winner() or self.board.is_full()
 
+    def wins_after(self, action):
+        return self.board.wins_with(action.space, action.player.player_id)
+
     def move_to_next_turn(self):
         if self.curr_turn is not None:
             self.turns.append(Connect4Turn(self.curr_turn.player))
@@ -121,7 +153,7 @@ class Connect4Game(Game):
         return self.winner
 
     def hash_game_state(self):
-        return hash(np.array2string(self.board))
+        return hash(np.array2string(self.board.board))
 
     def get_evaluation_for_player(self, player):
         if self.get_winner() == EMPTY_SPACE:
@@ -167,10 +199,10 @@ if __name__ == "__main__":
         game.play_game()
         wins[game.get_winner()] += 1
         for child in agent.mcts.get_children(agent.mcts.root):
-            first_move = list(zip(*np.where(child['game'].board == 0)))[0]
+            first_move = list(zip(*np.where(child['game'].board.board == 0)))[0]
             if move_values.get(first_move) is None:
                 move_values[first_move] = []
-            move_values[first_move].append(child['value'][0])
+            move_values[first_move].append(agent.mcts.get_value(child)[0])
         # print(game.actions)
         game = Connect4Game()
         game.create_players(agent, num_players)
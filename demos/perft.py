@@ -0,0 +1,62 @@
+from bg_rl.agent import RandomAgent
+from bg_rl.utilities.perft import Perft
+from connect2 import Connect2Game
+from connect4 import Connect4Game
+from tic_tac_toe import TicTacToeGame
+import argparse
+import sys
+
+GAMES = {
+    "connect2": Connect2Game,
+    "connect4": Connect4Game,
+    "tic_tac_toe": TicTacToeGame,
+}
+
+# Leaf counts for depths 1, 2, 3, ... from the starting position with two players. No Connect4
+# game can end before ply 7, so its counts from depth 8 on are the ones that check win detection
+REFERENCE_COUNTS = {
+    "connect2": [4, 12, 24, 12],
+    "connect4": [7, 49, 343, 2401, 16807, 117649, 823536, 5673234, 39394572],
+    "tic_tac_toe": [9, 72, 504, 3024, 15120, 54720, 148176, 200448, 127872],
+}
+
+def main(args):
+
+    game = GAMES[args.game]()
+    game.create_players(RandomAgent(), 2)
+    game.setup_game()
+
+    perft = Perft(game)
+    reference_counts = REFERENCE_COUNTS[args.game]
+    failed = False
+
+    for depth in range(1, args.depth+1):
+        leaves = perft.run(depth)
+        expected = reference_counts[depth-1] if depth <= len(reference_counts) else None
+        if expected is None:
+            status = "no reference"
+        elif leaves == expected:
+            status = "ok"
+        else:
+            status = f"MISMATCH, expected {expected}"
+            failed = True
+        print(f"depth {depth}: {leaves} leaves ({status})")
+        print(perft.report())
+
+    if args.divide is not None:
+        for action, leaves in perft.divide(args.divide).items():
+            print(f"{action}: {leaves}")
+
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--game", "-g", choices=list(GAMES.keys()), default="tic_tac_toe", help="Game to walk")
+    parser.add_argument("--depth", "-d", type=int, default=5, help="Walk depths 1 to this")
+    parser.add_argument("--divide", type=int, default=None, help="Also print leaf counts at this depth split by first action")
+
+    args = parser.parse_args()
+
+    main(args)
@@ -0,0 +1,81 @@
+from bg_rl.agent import MCTSAgent
+from bg_rl.mcts import EpsilonGreedyRolloutPolicy, RandomRolloutPolicy, TruncatedRolloutPolicy, WinBlockRolloutPolicy
+from connect4 import Connect4Game, Connect4Player, EMPTY_SPACE
+from copy import deepcopy
+import argparse
+import time
+
+def center_heuristic(game, action):
+    # Central columns take part in the most lines
+    return -abs(action.space - 3)
+
+def center_evaluation(game):
+    # Difference in pieces held in the central three columns, squashed into (-1, 1)
+    center = game.board.board[:, 2:5]
+    counts = {player_id: int((center == player_id).sum()) for player_id in game.players.keys()}
+    total = sum(counts.values())
+    if total == 0:
+        return {player_id: 0 for player_id in counts}
+    return {player_id: (2*count - total)/(total + 4) for player_id, count in counts.items()}
+
+POLICIES = {
+    "random": lambda args: RandomRolloutPolicy(),
+    "win_block": lambda args: WinBlockRolloutPolicy(),
+    "epsilon_greedy": lambda args: EpsilonGreedyRolloutPolicy(center_heuristic, epsilon=args.epsilon),
+    "truncated": lambda args: TruncatedRolloutPolicy(center_evaluation, args.max_plies),
+}
+
+def new_game(agents):
+    game = Connect4Game()
+    for player_id, agent in enumerate(agents):
+        game.players[player_id] = Connect4Player(player_id, agent)
+    game.setup_game()
+    return game
+
+def measure_speed(policy, num_rollouts):
+    game = new_game([None, None])
+    start = time.perf_counter()
+    for _ in range(num_rollouts):
+        policy.rollout(deepcopy(game))
+    return num_rollouts/(time.perf_counter() - start)
+
+def measure_strength(policy, num_games, steps):
+    # Plays MCTS with the policy against MCTS with uniform random rollouts, alternating who moves first
+    results = {"win": 0, "draw": 0, "loss": 0}
+    for i in range(num_games):
+        candidate = MCTSAgent(steps=steps, rollout_policy=policy)
+        baseline = MCTSAgent(steps=steps)
+        agents = [candidate, baseline] if i % 2 == 0 else [baseline, candidate]
+        game = new_game(agents)
+        for agent in agents:
+            agent.make_new_tree(game, len(agents))
+        game.play_game()
+        if game.get_winner() == EMPTY_SPACE:
+            results["draw"] += 1
+        elif game.players[game.get_winner()].agent is candidate:
+            results["win"] += 1
+        else:
+            results["loss"] += 1
+    return results
+
+def main(args):
+
+    for name in args.policies:
+        policy = POLICIES[name](args)
+        speed = measure_speed(policy, args.num_rollouts)
+        results = measure_strength(policy, args.num_games, args.steps)
+        print(f"{name}: {speed:.0f} rollouts/s, against random rollouts {results}")
+
+if __name__ == "__main__":
+    
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--policies", "-p", nargs="+", choices=list(POLICIES.keys()), default=list(POLICIES.keys()), help="Rollout policies to benchmark")
+    parser.add_argument("--num-rollouts", type=int, default=200, help="Rollouts from the empty board used to measure speed")
+    parser.add_argument("--num-games", "-n", type=int, default=10, help="Games played against MCTS with random rollouts")
+    parser.add_argument("--steps", type=int, default=50, help="MCTS steps per move")
+    parser.add_argument("--epsilon", type=float, default=0.2, help="Exploration rate for the epsilon greedy policy")
+    parser.add_argument("--max-plies", type=int, default=8, help="Plies played before the truncated policy evaluates")
+
+    args = parser.parse_args()
+
+    main(args)
@@ -0,0 +1,56 @@
+from bg_rl.selfplay import Coordinator, run_worker
+import argparse
+import asyncio
+import multiprocessing
+import time
+
+GAMES = {
+    "connect2": "connect2:Connect2Game",
+    "connect4": "connect4:Connect4Game",
+    "tic_tac_toe": "tic_tac_toe:TicTacToeGame",
+}
+
+def start_worker(port):
+    asyncio.run(run_worker("127.0.0.1", port))
+
+async def run(args):
+    jobs = [{"game": GAMES[args.game], "num_players": 2, "agent": {"steps": args.steps}, "seed": seed}
+            for seed in range(args.num_games)]
+    coordinator = Coordinator(jobs, job_timeout=args.job_timeout)
+    await coordinator.start()
+
+    # Workers on this machine stand in for remote ones, they only need the coordinator's address
+    workers = [multiprocessing.get_context("spawn").Process(target=start_worker, args=(coordinator.port,)) for _ in range(args.num_workers)]
+    for worker in workers:
+        worker.start()
+
+    start = time.time()
+    results = await coordinator.wait()
+    seconds = time.time() - start
+    await coordinator.stop()
+    for worker in workers:
+        worker.join()
+
+    wins = {}
+    for result in results.values():
+        wins[result["winner"]] = wins.get(result["winner"], 0) + 1
+    print(f"{len(results)} games in {seconds:.1f}s with {args.num_workers} workers ({len(results)/seconds:.2f} games/s)")
+    print(f"wins: {wins}")
+    if len(coordinator.failures) > 0:
+        print(f"failed jobs: {coordinator.failures}")
+
+def main(args):
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--game", "-g", choices=list(GAMES.keys()), default="tic_tac_toe", help="Game to play")
+    parser.add_argument("--num-games", "-n", type=int, default=20, help="Number of games to generate")
+    parser.add_argument("--num-workers", "-w", type=int, default=4, help="Number of local worker processes")
+    parser.add_argument("--steps", type=int, default=10, help="MCTS steps per move")
+    parser.add_argument("--job-timeout", type=float, default=None, help="Seconds before a game is handed to another worker")
+
+    args = parser.parse_args()
+
+    main(args)
@@ -73,24 +73,31 @@ class TicTacToeGame(Game):
 
     @time_func
     def play_game(self):
-        while self.get_winner() == EMPTY_SPACE and not self.board_is_full():
+        while not self.is_done():
             next_decision = self.get_next_decision()
             next_action = next_decision.determine_next_action(self)
             self.perform_action(next_action)
-            if self.is_winner():
-                break
 
     def is_winner(self):
-        for player_id in self.players.keys():
-            mask = self.board == player_id
-            out = mask.all(0).any() | mask.all(1).any()
-            out |= np.diag(mask).all() | np.diag(mask[:,::-1]).all()
-            if out:
-                self.winner = player_id
-                return True
+        if self.winner != EMPTY_SPACE:
+            return True
+        if self.last_action is None:
+            return False
+        # Only lines through the last space played can be new
+        x, y = self.last_action.space
+        player_id = self.board[x, y]
+        mask = self.board == player_id
+        lines = [mask[x, :], mask[:, y]]
+        if x == y:
+            lines.append(np.diag(mask))
+        if x + y == len(self.board) - 1:
+            lines.append(np.diag(mask[:,::-1]))
+        if any(line.all() for line in lines):
+            self.winner = int(player_id)
+            return True
         return False
                 
-    def is_done(self):
+    def check_done(self):
         return self.is_winner() or self.board_is_full()
 
     def move_to_next_turn(self):
@@ -103,7 +110,8 @@ class TicTacToeGame(Game):
         return self.winner
 
     def board_is_full(self):
-        return np.all(sum(np.where(self.board == EMPTY_SPACE, 1, 0)) == 0)
+        # Every action fills exactly one space
+        return self.move_count == self.board.size
 
     def hash_game_state(self):
         return hash(np.array2string(self.board))
@@ -152,7 +160,7 @@ def main(args):
             first_move = list(zip(*np.where(child['game'].board == 0)))[0]
             if move_values.get(first_move) is None:
                 move_values[first_move] = []
-            move_values[first_move].append(child['value'][0])
+            move_values[first_move].append(agent.mcts.get_value(child)[0])
         game = TicTacToeGame()
         game.create_players(agent, num_players)
         game.setup_game()